@@ -12,9 +12,16 @@ from __future__ import division
 import math
 import sys
 import os
-import datetime
 import random
 import pygame
+import numpy as np
+
+# numba is optional: when it is installed the collision scan below is
+# compiled to native code, otherwise the grid broadphase is used
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 
 ##################################
@@ -33,21 +40,47 @@ def load_sound(filename):
 
 def draw_centered(surface1, surface2, position):
     """Draw surface1 onto surface2 with center at position"""
-    rect = surface1.get_rect()
-    rect = rect.move(position[0]-rect.width//2, position[1]-rect.height//2)
-    surface2.blit(surface1, rect)
-
-
-def rotate_center(image, rect, angle):
-        """rotate the given image around its center & return an image & rect"""
-        rotate_image = pygame.transform.rotate(image, angle)
-        rotate_rect = rotate_image.get_rect(center=rect.center)
-        return rotate_image,rotate_rect
-
-
-def distance(p, q):
-    """Helper function to calculate distance between 2 points"""
-    return math.sqrt((p[0]-q[0])**2 + (p[1]-q[1])**2)
+    # blit straight to the centered top-left corner; building and
+    # moving a Rect here would allocate two objects per call. The
+    # affected rect that blit reports back is returned so callers can
+    # track what needs erasing next frame.
+    width, height = surface1.get_size()
+    return surface2.blit(surface1,\
+        (position[0]-width//2, position[1]-height//2))
+
+
+# sin/cos lookup tables for the 36 angles (multiples of 10 degrees)
+# the spaceship and missiles can take, indexed by angle // 10. The
+# signs already match the screen direction convention, so a direction
+# vector is just (_SIN[i], _COS[i]) with no trig calls per frame.
+_SIN = tuple(math.sin(-math.radians(a)) for a in range(0, 360, 10))
+_COS = tuple(-math.cos(math.radians(a)) for a in range(0, 360, 10))
+
+
+if njit is not None:
+    @njit(cache=True)
+    def collide_pairs(missile_pos, rock_pos, rock_r2):
+        """Find, for each missile, the first rock within range.
+
+        Takes (N,2) position arrays and per-rock squared hit radii,
+        returns parallel lists of missile and rock indices. Compiled
+        by numba, so the nested scan runs as native code.
+        """
+        hit_m = []
+        hit_r = []
+        for i in range(missile_pos.shape[0]):
+            mx = missile_pos[i, 0]
+            my = missile_pos[i, 1]
+            for j in range(rock_pos.shape[0]):
+                dx = mx - rock_pos[j, 0]
+                dy = my - rock_pos[j, 1]
+                if dx*dx + dy*dy < rock_r2[j]:
+                    hit_m.append(i)
+                    hit_r.append(j)
+                    break
+        return hit_m, hit_r
+else:
+    collide_pairs = None
 
 ################################
 # General Helper functions (END)
@@ -63,7 +96,7 @@ class GameObject(object):
         self.speed = speed
 
     def draw_on(self, screen):
-        draw_centered(self.image, screen, self.position)
+        return draw_centered(self.image, screen, self.position)
 
     def size(self):
         return max(self.image.get_height(), self.image.get_width())
@@ -79,10 +112,24 @@ class Spaceship(GameObject):
             load_image_convert_alpha('spaceship-off.png'))
         
         self.image_on = load_image_convert_alpha('spaceship-on.png')
+
+        # the image dimensions used to offset fired missiles never
+        # change, so look them up once instead of on every shot
+        self.image_width = self.image.get_width()
+        self.image_height = self.image.get_height()
+
         self.direction = [0, -1]
         self.is_throttle_on = False
         self.angle = 0
 
+        # the angle only ever takes multiples of 10 degrees, so rotate
+        # both images for all 36 of them once, instead of calling
+        # pygame.transform.rotate every frame in draw_on
+        self.rotated_off = {a: pygame.transform.rotate(self.image, a)\
+                            for a in range(0, 360, 10)}
+        self.rotated_on = {a: pygame.transform.rotate(self.image_on, a)\
+                           for a in range(0, 360, 10)}
+
         # a list to hold the missiles fired by the spaceship
         # (that are active (on the screen))
         self.active_missiles = []
@@ -91,23 +138,23 @@ class Spaceship(GameObject):
         """Draw the spaceship on the screen"""
 
         # select the image, based on the fact that spaceship is accelerating
-        # or not
+        # or not, from the pre-rotated cache
         if self.is_throttle_on:
-            new_image, rect = rotate_center(self.image_on, \
-                self.image_on.get_rect(), self.angle)
+            new_image = self.rotated_on[self.angle % 360]
         else:
-            new_image, rect = rotate_center(self.image, \
-                self.image.get_rect(), self.angle)
-        
-        draw_centered(new_image, screen, self.position)
+            new_image = self.rotated_off[self.angle % 360]
+
+        # draw_centered re-centers the rotated image, so no rect math
+        # is needed here
+        return draw_centered(new_image, screen, self.position)
 
 
     def move(self):
         """Do one frame's worth of updating for the object"""
-        
-        # calculate the direction from the angle variable
-        self.direction[0] = math.sin(-math.radians(self.angle))
-        self.direction[1] = -math.cos(math.radians(self.angle))
+
+        # look the direction up from the angle (always a multiple of 10)
+        self.direction[0] = _SIN[self.angle // 10]
+        self.direction[1] = _COS[self.angle // 10]
 
         # calculate the position from the direction and speed
         self.position[0] += self.direction[0]*self.speed
@@ -124,8 +171,8 @@ class Spaceship(GameObject):
         # for example missiles should be fired from the bottom of
         # the spaceship if it's facing down.
         adjust = [0, 0]
-        adjust[0] = math.sin(-math.radians(self.angle))*self.image.get_width()
-        adjust[1] = -math.cos(math.radians(self.angle))*self.image.get_height()
+        adjust[0] = _SIN[self.angle // 10]*self.image_width
+        adjust[1] = _COS[self.angle // 10]*self.image_height
 
         # create a new missile using the calculated adjusted position
         new_missile = Missile((self.position[0]+adjust[0],\
@@ -137,69 +184,97 @@ class Spaceship(GameObject):
 
 class Missile(GameObject):
     """Resembles a missile"""
+
+    # shared missile image, loaded once on first use (lazily, because
+    # the display must be initialized before convert_alpha works)
+    image_cache = None
+
     def __init__(self, position, angle, speed=15):
-        super(Missile, self).__init__(position,\
-            load_image_convert_alpha('missile.png'))
+        if Missile.image_cache is None:
+            Missile.image_cache = load_image_convert_alpha('missile.png')
+
+        super(Missile, self).__init__(position, Missile.image_cache)
 
         self.angle = angle
-        self.direction = [0, 0]
-        self.speed = speed        
+        self.speed = speed
+
+        # a missile's heading never changes after firing, so resolve
+        # the direction from the tables once and bake the speed in;
+        # move() is then two plain adds
+        self.direction = [_SIN[angle // 10], _COS[angle // 10]]
+        self.velocity = (self.direction[0]*speed,\
+                         self.direction[1]*speed)
 
 
     def move(self):
         """Move the missile towards its destination"""
 
-        # calculate the direction from the angle variable
-        self.direction[0] = math.sin(-math.radians(self.angle))
-        self.direction[1] = -math.cos(math.radians(self.angle))
-
-        # calculate the position from the direction and speed
-        self.position[0] += self.direction[0]*self.speed
-        self.position[1] += self.direction[1]*self.speed
+        self.position[0] += self.velocity[0]
+        self.position[1] += self.velocity[1]
 
         
     
 class Rock(GameObject):
     """Resembles a rock"""
+
+    # shared images for the three sizes, loaded once on first use
+    # (lazily, because the display must be initialized first), so
+    # splitting a rock no longer hits the disk
+    image_cache = None
+
+    # the valid sizes, the size a rock splits into when a missile
+    # destroys it, and the score a hit on each size is worth
+    sizes = ("big", "normal", "small")
+    next_size = {"big": "normal", "normal": "small", "small": None}
+    scores = {"big": 20, "normal": 50, "small": 100}
+
+    # missile hit radius for each size
+    hit_radii = {"big": 80, "normal": 55, "small": 30}
+
     def __init__(self, position, size, speed=4):
         """Initialize a Rock object, given its position and size"""
 
-        # if the size is valid
-        if size in {"big", "normal", "small"}:
+        if size not in Rock.sizes:
+            # refuse to build a half-initialized rock; the old code
+            # silently returned and let the broken object escape
+            raise ValueError("unknown rock size: " + str(size))
 
-            # load the correct image from file
-            str_filename = "rock-" + str(size) + ".png"
-            super(Rock, self).__init__(position,\
-                load_image_convert_alpha(str_filename))
-            self.size = size
-        
-        else:
-            # the size is not pre-defined
-            return None
+        if Rock.image_cache is None:
+            Rock.image_cache = \
+                {s: load_image_convert_alpha("rock-" + s + ".png")\
+                 for s in Rock.sizes}
+
+        super(Rock, self).__init__(position, Rock.image_cache[size])
+        self.size = size
+
+        # precompute the hit radius and its square, so collision
+        # loops don't need to dispatch on the size string
+        self.hit_radius = Rock.hit_radii[size]
+        self.hit_radius_sq = self.hit_radius*self.hit_radius
 
         self.position = list(position)
 
         self.speed = speed
         
-        # create a random movement direction vector
-        if bool(random.getrandbits(1)):
-            rand_x = random.random()* -1
-        else:
-            rand_x = random.random()
-        
-        if bool(random.getrandbits(1)):
-            rand_y = random.random() * -1
-        else:
-            rand_y = random.random()
+        # create a random movement direction vector, normalized to
+        # unit length so the effective speed does not depend on the
+        # direction that was drawn
+        rand_x = random.random()*2 - 1
+        rand_y = random.random()*2 - 1
+        norm = math.hypot(rand_x, rand_y) or 1.0
+        self.direction = [rand_x/norm, rand_y/norm]
 
-        self.direction = [rand_x, rand_y]
+        # the direction never changes, so bake the speed in once and
+        # make move() two plain adds
+        self.velocity = (self.direction[0]*self.speed,\
+                         self.direction[1]*self.speed)
 
 
     def move(self):
         """Move the rock"""
 
-        self.position[0] += self.direction[0]*self.speed
-        self.position[1] += self.direction[1]*self.speed
+        self.position[0] += self.velocity[0]
+        self.position[1] += self.velocity[1]
 
 
 
@@ -209,12 +284,18 @@ class MyGame(object):
     PLAYING, DYING, GAME_OVER, STARTING, WELCOME = range(5)
 
     # defining custom events
-    REFRESH, START, RESTART = range(pygame.USEREVENT, pygame.USEREVENT+3)
+    START, RESTART = range(pygame.USEREVENT, pygame.USEREVENT+2)
+
+    # cell size of the uniform collision grid; roughly twice the big
+    # rock radius, so a 3x3 cell neighborhood always covers a hit
+    GRID_CELL = 128
 
     def __init__(self):
         """Initialize a new game"""
-        pygame.mixer.init()
-        pygame.mixer.pre_init(44100, -16, 2, 2048)
+        # pre_init only affects the next mixer init, so it has to run
+        # before pygame.init (which initializes the mixer); a small
+        # buffer keeps the sound latency low
+        pygame.mixer.pre_init(44100, -16, 2, 512)
         pygame.init()
 
         # set up a 800 x 600 window
@@ -225,6 +306,11 @@ class MyGame(object):
         # use a black background
         self.bg_color = 0, 0, 0
 
+        # fblits batches many (image, position) blits in a single call;
+        # fall back to blits on pygame versions that don't have it
+        self.blit_batch = getattr(self.screen, "fblits", None) or \
+            self.screen.blits
+
         # loading the sound track for the game
         self.soundtrack = load_sound('soundtrack.wav')
         self.soundtrack.set_volume(.3)
@@ -242,22 +328,44 @@ class MyGame(object):
         self.gameover_text = self.big_font.render('GAME OVER',\
             True, (255, 0, 0))
 
+        # cache for the rendered score text; it is only re-rendered
+        # when the score actually changes, not every frame
+        self.score_cached = None
+        self.score_surface = None
+
+        # the areas drawn to last frame; draw() erases just these
+        # instead of refilling the whole screen every frame
+        self.prev_rects = []
+
         # load a spaceship image (only used to display number of lives)
         self.lives_image = load_image_convert_alpha('spaceship-off.png')
 
-        # Setup a timer to refresh the display FPS times per second
+        # the display is refreshed FPS times per second (paced by the
+        # clock in run)
         self.FPS = 30
-        pygame.time.set_timer(self.REFRESH, 1000//self.FPS)
 
         # a dictionary of death distances of different rock sizes
         self.death_distances = {"big":90,"normal":65 ,"small":40}
 
+        # squared versions of the death distances, so the per-frame
+        # checks can compare dx*dx+dy*dy without taking a square root
+        # (each rock carries its own squared missile hit radius)
+        self.death_distances_sq = \
+            {size: d*d for size, d in self.death_distances.items()}
+
+        # trigger numba's one-time compile of the collision kernel up
+        # front, so the first frame with missiles doesn't stall on it
+        if collide_pairs is not None:
+            collide_pairs(np.zeros((1, 2), dtype=np.float32),\
+                          np.zeros((1, 2), dtype=np.float32),\
+                          np.zeros(1, dtype=np.float32))
+
         # display the welcome screen
         self.do_welcome()
 
-        # used to monitor missile firing time
+        # tick count of the last missile fired (in milliseconds),
         # to prevent firing too many missiles in a short time
-        self.fire_time = datetime.datetime.now()
+        self.fire_time_ms = 0
 
 
     def do_welcome(self):
@@ -302,23 +410,29 @@ class MyGame(object):
     def make_rock(self, size="big", pos=None):
         """Make a new rock"""
 
-        # minimum margin when creating rocks
-        margin = 200
-
         if pos == None:
-            # no position was passed. make at a random location
-
-            rand_x = random.randint(margin, self.width-margin)
-            rand_y = random.randint(margin, self.height-margin)
-            
-            # while the co-ordinate is too close, discard it
-            # and generate another one
-            while distance((rand_x, rand_y), self.spaceship.position) < \
-                    self.min_rock_distance:
-                
-                # choose another random co-ordinate
-                rand_x = random.randint(0, self.width)
-                rand_y = random.randint(0, self.height)
+            # no position was passed. sample one directly: a random
+            # heading and a distance of at least min_rock_distance
+            # from the spaceship, wrapped into the screen. This lands
+            # on a valid point almost always, where the old uniform
+            # rejection loop could retry many times.
+            min_d2 = self.min_rock_distance**2
+            max_r = math.hypot(self.width, self.height)/2
+
+            while True:
+                theta = random.random()*2*math.pi
+                r = random.uniform(self.min_rock_distance, max_r)
+                rand_x = int(self.spaceship.position[0]\
+                             + r*math.cos(theta)) % self.width
+                rand_y = int(self.spaceship.position[1]\
+                             + r*math.sin(theta)) % self.height
+
+                # wrapping can occasionally pull the point back near
+                # the spaceship; re-sample in that rare case
+                dx = rand_x - self.spaceship.position[0]
+                dy = rand_y - self.spaceship.position[1]
+                if dx*dx + dy*dy >= min_d2:
+                    break
 
             temp_rock = Rock((rand_x, rand_y), size)
 
@@ -343,115 +457,139 @@ class MyGame(object):
 
 
     def run(self):
-        """Loop forever processing events"""
-        running = True
-        while running:
-            event = pygame.event.wait()
-
-            # player is asking to quit
-            if event.type == pygame.QUIT:
-                running = False
-
-            # time to draw a new frame
-            elif event.type == MyGame.REFRESH:
-                
-                if self.state != MyGame.WELCOME:
-
-                    keys = pygame.key.get_pressed()
-                
-                    if keys[pygame.K_SPACE]:
-                        new_time = datetime.datetime.now()
-                        if new_time - self.fire_time > \
-                                datetime.timedelta(seconds=0.15):
-                            # there should be a minimum of 0.15 delay between
-                            # firing each missile
-
-                            # fire a missile
-                            self.spaceship.fire()
-
-                            # play the sound
-                            self.missile_sound.play()
-
-                            # record the current fire time
-                            self.fire_time = new_time
-
-                    if self.state == MyGame.PLAYING:
-                        # if the game is going on
-
-                        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                            # when pressing "d" or "right arrow" rotate
-                            # the spaceship clockwise by 10 degrees
-                            self.spaceship.angle -= 10
-                            self.spaceship.angle %= 360
-
-                        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                            # when pressing "d" or "right arrow" rotate
-                            # the spaceship counter clockwise by 10 degrees
-                            self.spaceship.angle += 10
-                            self.spaceship.angle %= 360
-
-                        if keys[pygame.K_UP] or keys[pygame.K_w]:
-                            # if "w" or "up arrow" is pressed,
-                            # we should accelerate
-                            self.spaceship.is_throttle_on = True
-                            
-                            # increase the speed
-                            if self.spaceship.speed < 20:
-                                self.spaceship.speed += 1
-                        else:
-                            # if the throttle key ("d" or "up")
-                            # is not pressed, slow down
-                            if self.spaceship.speed > 0:
-                                self.spaceship.speed -= 1
-                            self.spaceship.is_throttle_on = False
-
-                        # if there are any missiles on the screen, process them
-                        if len(self.spaceship.active_missiles) > 0:
-                            self.missiles_physics()
-
-                        # if there are any rocks, do their physics
-                        if len(self.rocks) > 0:
-                            self.rocks_physics()
-
-                        # do the spaceship physics
-                        self.physics()
-
-                # draw everything
-                self.draw()
-
-            # resume after losing a life
-            elif event.type == MyGame.START:
-                pygame.time.set_timer(MyGame.START, 0) # turn the timer off
-                if self.lives < 1:
-                    self.game_over()
-                else:
-                    self.rocks = []
-                    # make 4 rocks
-                    for i in range(4):
-                        self.make_rock()
-                    # start again
-                    self.start()
-
-            # switch from game over screen to new game
-            elif event.type == MyGame.RESTART:
-                pygame.time.set_timer(MyGame.RESTART, 0) # turn the timer off
-                self.state = MyGame.STARTING
-
-            # user is clicking to start a new game
-            elif event.type == pygame.MOUSEBUTTONDOWN \
-                    and (self.state == MyGame.STARTING or\
-                            self.state == MyGame.WELCOME):
-                self.do_init()
-
-            # user is pressing enter to start a new game
-            elif event.type == pygame.KEYDOWN \
-                    and event.key == pygame.K_RETURN and \
-                        (self.state == MyGame.STARTING or \
-                            self.state == MyGame.WELCOME):
-                self.do_init()
+        """Loop forever, processing events and drawing frames"""
+
+        # a dict gives O(1) dispatch on the event type instead of an
+        # elif chain; unhandled event types simply aren't in it
+        handlers = {
+            pygame.QUIT: self.handle_quit,
+            MyGame.START: self.handle_start,
+            MyGame.RESTART: self.handle_restart,
+            pygame.MOUSEBUTTONDOWN: self.handle_mousedown,
+            pygame.KEYDOWN: self.handle_keydown,
+        }
+
+        # the clock paces the loop at FPS frames per second
+        clock = pygame.time.Clock()
+        self.running = True
+
+        while self.running:
+            # drain everything that has queued up since last frame
+            for event in pygame.event.get():
+                handler = handlers.get(event.type)
+                if handler is not None:
+                    handler(event)
+
+            # exactly one update and one draw per frame, no matter how
+            # many events arrived, so the game can't snowball behind
+            self.update()
+            self.draw()
+
+            clock.tick(self.FPS)
+
+
+    def handle_quit(self, event):
+        """Player is asking to quit"""
+        self.running = False
+
+
+    def handle_start(self, event):
+        """Resume after losing a life"""
+        pygame.time.set_timer(MyGame.START, 0) # turn the timer off
+        if self.lives < 1:
+            self.game_over()
+        else:
+            self.rocks = []
+            # make 4 rocks
+            for i in range(4):
+                self.make_rock()
+            # start again
+            self.start()
+
+
+    def handle_restart(self, event):
+        """Switch from game over screen to new game"""
+        pygame.time.set_timer(MyGame.RESTART, 0) # turn the timer off
+        self.state = MyGame.STARTING
+
+
+    def handle_mousedown(self, event):
+        """User is clicking to start a new game"""
+        if self.state == MyGame.STARTING or self.state == MyGame.WELCOME:
+            self.do_init()
+
+
+    def handle_keydown(self, event):
+        """User is pressing enter to start a new game"""
+        if event.key == pygame.K_RETURN and \
+                (self.state == MyGame.STARTING or \
+                    self.state == MyGame.WELCOME):
+            self.do_init()
+
+
+    def update(self):
+        """Do one frame's worth of input handling and physics"""
+
+        if self.state == MyGame.WELCOME:
+            return
+
+        keys = pygame.key.get_pressed()
+
+        if keys[pygame.K_SPACE]:
+            now_ms = pygame.time.get_ticks()
+            if now_ms - self.fire_time_ms > 150:
+                # there should be a minimum of 150 ms between
+                # firing each missile
+
+                # fire a missile
+                self.spaceship.fire()
+
+                # play the sound
+                self.missile_sound.play()
 
+                # record the current fire time
+                self.fire_time_ms = now_ms
+
+        if self.state == MyGame.PLAYING:
+            # if the game is going on
+
+            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+                # when pressing "d" or "right arrow" rotate
+                # the spaceship clockwise by 10 degrees
+                self.spaceship.angle -= 10
+                self.spaceship.angle %= 360
+
+            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+                # when pressing "d" or "right arrow" rotate
+                # the spaceship counter clockwise by 10 degrees
+                self.spaceship.angle += 10
+                self.spaceship.angle %= 360
+
+            if keys[pygame.K_UP] or keys[pygame.K_w]:
+                # if "w" or "up arrow" is pressed,
+                # we should accelerate
+                self.spaceship.is_throttle_on = True
+
+                # increase the speed
+                if self.spaceship.speed < 20:
+                    self.spaceship.speed += 1
             else:
-                pass # an event type we don't handle            
+                # if the throttle key ("d" or "up")
+                # is not pressed, slow down
+                if self.spaceship.speed > 0:
+                    self.spaceship.speed -= 1
+                self.spaceship.is_throttle_on = False
+
+            # if there are any missiles on the screen, process them
+            if len(self.spaceship.active_missiles) > 0:
+                self.missiles_physics()
+
+            # if there are any rocks, do their physics
+            if len(self.rocks) > 0:
+                self.rocks_physics()
+
+            # do the spaceship physics
+            self.physics()
 
 
     def game_over(self):
@@ -494,52 +632,130 @@ class MyGame(object):
     def missiles_physics(self):
         """Do all the physics of missiles"""
         
+        missiles = self.spaceship.active_missiles
+
         # if there are any active missiles
-        if len(self.spaceship.active_missiles) >  0:
-            for missile in self.spaceship.active_missiles:
+        if len(missiles) >  0:
+            for missile in missiles:
                 # move the missile
                 missile.move()
 
-                # check the collision with each rock
-                for rock in self.rocks:
-                    if rock.size == "big":
-                        # if the missile hits a big rock, destroy it,
-                        # make two medium sized rocks and give 20 scores
-                        if distance(missile.position, rock.position) < 80:
-                            self.rocks.remove(rock)
-                            if missile in self.spaceship.active_missiles:
-                                self.spaceship.active_missiles.remove(missile)
-                            self.make_rock("normal", \
-                                (rock.position[0]+10, rock.position[1]))
-                            self.make_rock("normal", \
-                                (rock.position[0]-10, rock.position[1]))
-                            self.score += 20
-
-                    elif rock.size == "normal":
-                        # if the missile hits a medium sized rock, destroy it,
-                        # make two small sized rocks and give 50 scores
-                        if distance(missile.position, rock.position) < 55:
-                            self.rocks.remove(rock)
-                            if missile in self.spaceship.active_missiles:
-                                self.spaceship.active_missiles.remove(missile)
-                            self.make_rock("small", \
-                                (rock.position[0]+10, rock.position[1]))
-                            self.make_rock("small", \
-                                (rock.position[0]-10, rock.position[1]))
-                            self.score += 50
-                    else:
-                        # if the missile hits a small rock, destroy it,
-                        # make one big rock if there are less than 10 rocks
-                        # on the screen, and give 100 scores
-                        if distance(missile.position, rock.position) < 30:
-                            self.rocks.remove(rock)
-                            if missile in self.spaceship.active_missiles:
-                                self.spaceship.active_missiles.remove(missile)
-                            
-                            if len(self.rocks) < 10:
-                                self.make_rock()
-                            
-                            self.score += 100
+            if len(self.rocks) == 0:
+                return
+
+            # broadphase: find a candidate (missile, rock) pair for
+            # every missile within hit range of some rock. With numba
+            # installed the whole scan runs as one compiled kernel
+            # over gathered arrays; otherwise the rocks are binned
+            # into a coarse uniform grid and each missile is tested
+            # only against its 3x3 cell neighborhood.
+            if collide_pairs is not None:
+                missile_pos = np.array([m.position for m in missiles],\
+                    dtype=np.float32)
+                rock_pos = np.array([r.position for r in self.rocks],\
+                    dtype=np.float32)
+                rock_r2 = np.array(\
+                    [r.hit_radius_sq for r in self.rocks],\
+                    dtype=np.float32)
+
+                pairs = zip(*collide_pairs(missile_pos, rock_pos,\
+                    rock_r2))
+            else:
+                cell = MyGame.GRID_CELL
+                grid = {}
+                for ri, rock in enumerate(self.rocks):
+                    key = (int(rock.position[0])//cell,\
+                           int(rock.position[1])//cell)
+                    grid.setdefault(key, []).append(ri)
+
+                pairs = []
+                for mi, missile in enumerate(missiles):
+                    mx = missile.position[0]
+                    my = missile.position[1]
+                    cx = int(mx)//cell
+                    cy = int(my)//cell
+
+                    # find the first rock this missile hits
+                    hit_ri = -1
+                    for gx in (cx-1, cx, cx+1):
+                        for gy in (cy-1, cy, cy+1):
+                            for ri in grid.get((gx, gy), ()):
+                                rock = self.rocks[ri]
+                                radius = rock.hit_radius
+
+                                # cheap axis-aligned prefilter: most
+                                # pairs are rejected on one subtract
+                                # and compare, before any multiply
+                                dx = mx - rock.position[0]
+                                if dx > radius or dx < -radius:
+                                    continue
+                                dy = my - rock.position[1]
+                                if dy > radius or dy < -radius:
+                                    continue
+
+                                if dx*dx + dy*dy < rock.hit_radius_sq:
+                                    hit_ri = ri
+                                    break
+                            if hit_ri >= 0:
+                                break
+                        if hit_ri >= 0:
+                            break
+
+                    if hit_ri >= 0:
+                        pairs.append((mi, hit_ri))
+
+            # mark hit objects by index and sweep both lists once at
+            # the end, instead of an O(N) remove per hit while the
+            # lists are being walked
+            dead_rocks = set()
+            dead_missiles = set()
+
+            for mi, ri in pairs:
+                # the rock may already be spent on an earlier missile
+                # this frame (each missile shows up in one pair only)
+                if ri in dead_rocks:
+                    continue
+
+                rock = self.rocks[ri]
+                dead_rocks.add(ri)
+                dead_missiles.add(mi)
+
+                self.score += Rock.scores[rock.size]
+                smaller = Rock.next_size[rock.size]
+
+                if smaller is not None:
+                    # a big or medium rock splits into two rocks of
+                    # the next size down
+                    self.make_rock(smaller, \
+                        (rock.position[0]+10, rock.position[1]))
+                    self.make_rock(smaller, \
+                        (rock.position[0]-10, rock.position[1]))
+                else:
+                    # a small rock is destroyed outright; make a new
+                    # big rock if there are less than 10 rocks left
+                    # on the screen
+                    if len(self.rocks) - len(dead_rocks) < 10:
+                        self.make_rock()
+
+            # sweep: compact each list in place with a write index,
+            # one pass per list with no reallocation, keeping the
+            # list identity so other references to it stay valid
+            if dead_rocks:
+                rocks = self.rocks
+                write = 0
+                for i in range(len(rocks)):
+                    if i not in dead_rocks:
+                        rocks[write] = rocks[i]
+                        write += 1
+                del rocks[write:]
+
+            if dead_missiles:
+                write = 0
+                for i in range(len(missiles)):
+                    if i not in dead_missiles:
+                        missiles[write] = missiles[i]
+                        write += 1
+                del missiles[write:]
 
 
     def rocks_physics(self):
@@ -552,42 +768,68 @@ class MyGame(object):
                 # move the rock
                 rock.move()
 
-
-                # if the rock hits the spaceship, die once
-                if distance(rock.position, self.spaceship.position) < \
-                        self.death_distances[rock.size]:
-                    self.die()
-
-                # if the rock goes out of screen and there are less than
-                # 10 rocks on the screen, create a new rock with the same size
-                elif distance(rock.position, (self.width/2, self.height/2)) > \
-                     math.sqrt((self.width/2)**2 + (self.height/2)**2):
-
-                    self.rocks.remove(rock)
-                    if len(self.rocks) < 10:
-                        self.make_rock(rock.size)
+                # classic asteroids screen wrap: once a rock is fully
+                # past an edge (60 pixel margin), bring it back in on
+                # the opposite side, instead of destroying it and
+                # paying for a replacement rock
+                if rock.position[0] < -60 or \
+                        rock.position[0] > self.width+60 or \
+                        rock.position[1] < -60 or \
+                        rock.position[1] > self.height+60:
+                    rock.position[0] %= self.width
+                    rock.position[1] %= self.height
+
+            # squared distances of every rock to the spaceship,
+            # computed in one broadcast
+            rock_pos = np.array([r.position for r in self.rocks],\
+                dtype=np.float32)
+            death_r2 = np.array(\
+                [self.death_distances_sq[r.size] for r in self.rocks],\
+                dtype=np.float32)
+
+            ship_d2 = ((rock_pos - np.array(self.spaceship.position,\
+                dtype=np.float32))**2).sum(1)
+
+            # if any rock hits the spaceship, die once
+            if (ship_d2 < death_r2).any():
+                self.die()
 
 
     def draw(self):
         """Update the display"""
-        # everything we draw now is to a buffer that is not displayed
-        self.screen.fill(self.bg_color)
-    
+        # everything we draw now is to a buffer that is not displayed.
+        # Erase only what was drawn last frame instead of filling the
+        # whole 800x600 screen; the sprites cover far less area. Every
+        # blit below records its destination into rects for next frame.
+        for rect in self.prev_rects:
+            self.screen.fill(self.bg_color, rect)
+        rects = []
+
         # if we are not on the welcome screen
         if self.state != MyGame.WELCOME:
 
-            # draw the spaceship
-            self.spaceship.draw_on(self.screen)
-
-            # if there are any active missiles draw them
-            if len(self.spaceship.active_missiles) >  0:
-                for missile in self.spaceship.active_missiles:
-                    missile.draw_on(self.screen)
-
-            # draw the rocks
-            if len(self.rocks) >  0:
-                for rock in self.rocks:
-                    rock.draw_on(self.screen)
+            # draw the spaceship (kept separate because of its rotation)
+            rects.append(self.spaceship.draw_on(self.screen))
+
+            # batch the missiles and the rocks into one blit call,
+            # building the centered top-left corners directly instead
+            # of going through draw_centered for each object
+            sprites = [(m.image,\
+                (m.position[0]-m.image.get_width()//2,\
+                 m.position[1]-m.image.get_height()//2))\
+                for m in self.spaceship.active_missiles]
+            sprites += [(r.image,\
+                (r.position[0]-r.image.get_width()//2,\
+                 r.position[1]-r.image.get_height()//2))\
+                for r in self.rocks]
+
+            if sprites:
+                self.blit_batch(sprites)
+                # fblits doesn't report the touched areas, but we
+                # already know each sprite's corner and size
+                rects.extend((corner[0], corner[1],\
+                    image.get_width(), image.get_height())\
+                    for image, corner in sprites)
 
             # if we are in game play mode
             if self.state == MyGame.PLAYING:
@@ -609,35 +851,45 @@ class MyGame(object):
                     # set the counter back to zero
                     self.counter = 0
 
-            # create and display the text for score
-            scores_text = self.medium_font.render(str(self.score),\
-                                                    True, (0, 155, 0))
-            draw_centered(scores_text, self.screen,\
+            # create and display the text for score, re-rendering the
+            # surface only when the score has changed (the game over
+            # text above is cached the same way, in __init__)
+            if self.score_cached != self.score:
+                self.score_surface = self.medium_font.render(\
+                    str(self.score), True, (0, 155, 0))
+                self.score_cached = self.score
+
+            scores_text = self.score_surface
+            rects.append(draw_centered(scores_text, self.screen,\
                 (self.width-scores_text.get_width(), scores_text.get_height()+\
-                                                        10))
+                                                        10)))
 
             # if the game is over, display the game over text
             if self.state == MyGame.GAME_OVER or self.state == MyGame.STARTING:
-                draw_centered(self.gameover_text, self.screen,\
-                                (self.width//2, self.height//2))
+                rects.append(draw_centered(self.gameover_text, self.screen,\
+                                (self.width//2, self.height//2)))
 
             # draw lives
             for i in range(self.lives):
-                draw_centered(self.lives_image, self.screen,\
+                rects.append(draw_centered(self.lives_image, self.screen,\
                     (self.lives_image.get_width()*i*1.2+40,\
-                        self.lives_image.get_height()//2))
+                        self.lives_image.get_height()//2)))
 
         else:
             # draw the welcome texts
-            draw_centered(self.welcome_asteroids, self.screen,\
+            rects.append(draw_centered(self.welcome_asteroids, self.screen,\
                 (self.width//2, self.height//2\
-                    -self.welcome_asteroids.get_height()))
+                    -self.welcome_asteroids.get_height())))
 
-            draw_centered(self.welcome_desc, self.screen,\
+            rects.append(draw_centered(self.welcome_desc, self.screen,\
                 (self.width//2, self.height//2\
-                    +self.welcome_desc.get_height()))
+                    +self.welcome_desc.get_height())))
 
+        # remember what we touched for next frame's erase pass, then
         # flip buffers so that everything we have drawn gets displayed
+        # (update(rect_list) loses to flip once there are many small
+        # rects, so the full flip stays)
+        self.prev_rects = rects
         pygame.display.flip()
 
 